@@ -0,0 +1,151 @@
+"""
+Equivalence checks for the Wordle solver's scorers.
+
+eval_guess is the reference; the NumPy batch scorer and the pattern-matrix kernels
+must agree with it on the bundled word lists and on words with repeated letters.
+"""
+
+import multiprocessing
+import os
+from typing import List
+
+import numpy as np
+import pytest
+
+import wordle
+
+REPEATED_LETTER_WORDS = ["eerie", "sissy", "geese", "llama", "mamma", "error", "fluff"]
+
+
+def read_words(filename: str) -> List[str]:
+    """
+    Read a bundled word list.
+
+    Args:
+        filename (str): name of the word list next to this file
+
+    Returns:
+        List[str]: words in the list
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+    with open(path, mode="r", encoding="utf-8") as word_file:
+        return [x.strip() for x in word_file.readlines() if x.strip()]
+
+
+@pytest.fixture(name="answers", scope="module")
+def fixture_answers() -> List[str]:
+    """Bundled legal answers."""
+    return read_words(wordle.ANSWERS_FILENAME)
+
+
+@pytest.fixture(name="guesses", scope="module")
+def fixture_guesses(answers: List[str]) -> List[str]:
+    """Bundled legal guesses and answers, plus words with repeated letters."""
+    return list(
+        dict.fromkeys(
+            read_words(wordle.GUESSES_FILENAME) + answers + REPEATED_LETTER_WORDS
+        )
+    )
+
+
+@pytest.fixture(name="pattern_matrix", scope="module")
+def fixture_pattern_matrix(guesses: List[str], answers: List[str]) -> np.ndarray:
+    """Pattern matrix as built by the solver."""
+    return wordle.get_pattern_matrix(guesses, answers)
+
+
+def sample_guesses(guesses: List[str]) -> List[str]:
+    """Every 50th guess plus the words with repeated letters."""
+    return guesses[::50] + REPEATED_LETTER_WORDS
+
+
+def test_eval_guess_batch_matches_eval_guess(answers: List[str], guesses: List[str]):
+    """The NumPy batch scorer agrees with the reference scorer."""
+    answers_arr, answers_mask = wordle.encode_words(answers)
+    for guess in sample_guesses(guesses):
+        patterns = wordle.eval_guess_patterns(guess, answers_arr, answers_mask)
+        for answer, pattern in zip(answers, patterns):
+            assert wordle.pattern_to_response(int(pattern)) == wordle.eval_guess(
+                guess, answer
+            ), (guess, answer)
+
+
+def test_pattern_matrix_matches_eval_guess(
+    answers: List[str], guesses: List[str], pattern_matrix: np.ndarray
+):
+    """The pattern matrix agrees with the reference scorer."""
+    index = {guess: i for i, guess in enumerate(guesses)}
+    for guess in sample_guesses(guesses):
+        for answer, pattern in zip(answers, pattern_matrix[index[guess]]):
+            assert wordle.pattern_to_response(int(pattern)) == wordle.eval_guess(
+                guess, answer
+            ), (guess, answer)
+
+
+def test_pattern_matrix_matches_eval_guess_batch(
+    answers: List[str], guesses: List[str], pattern_matrix: np.ndarray
+):
+    """Every row of the pattern matrix agrees with the NumPy batch scorer."""
+    answers_arr, answers_mask = wordle.encode_words(answers)
+    for guess, row in zip(guesses, pattern_matrix):
+        expected = wordle.eval_guess_patterns(guess, answers_arr, answers_mask)
+        np.testing.assert_array_equal(row, expected, err_msg=guess)
+
+
+def random_answer_subsets(n_answers: int) -> List[np.ndarray]:
+    """A few sorted random subsets of answer columns, of various sizes."""
+    rng = np.random.default_rng(0)
+    return [
+        np.sort(rng.choice(n_answers, size, replace=False))
+        for size in [1, 2, 5, 20, 100, 500]
+        for _ in range(3)
+    ] + [np.arange(n_answers)]
+
+
+@pytest.mark.skipif(wordle.numba is None, reason="requires Numba")
+def test_bounded_hardest_responses_match_partition_sizes(pattern_matrix: np.ndarray):
+    """Pruning leaves the best guess and its hardest response unchanged."""
+    guess_idx = np.arange(len(pattern_matrix))
+    for answer_idx in random_answer_subsets(pattern_matrix.shape[1]):
+        sizes, worst = wordle.get_bounded_hardest_responses(
+            pattern_matrix, guess_idx, answer_idx
+        )
+        counts = wordle.get_partition_sizes(
+            pattern_matrix[np.ix_(guess_idx, answer_idx)]
+        )
+        expected_sizes, expected_worst = wordle.get_hardest_responses(counts)
+        best = wordle.rank_guesses(sizes, sizes, wordle.GREEN_COUNTS[worst], 1)[0]
+        expected_best = wordle.rank_guesses(
+            expected_sizes, expected_sizes, wordle.GREEN_COUNTS[expected_worst], 1
+        )[0]
+        assert best == expected_best
+        assert sizes[best] == expected_sizes[best]
+        assert worst[best] == expected_worst[best]
+        # Every guess is either counted exactly or pruned above the best size.
+        exact = (sizes == expected_sizes) & (worst == expected_worst)
+        assert (exact | (sizes > expected_sizes.min())).all()
+        assert (sizes <= expected_sizes).all()
+
+
+def test_pool_pattern_matrix_matches_compiled(
+    monkeypatch: pytest.MonkeyPatch,
+    answers: List[str],
+    guesses: List[str],
+    pattern_matrix: np.ndarray,
+):
+    """The memory-mapped process pool path builds the same pattern matrix."""
+    monkeypatch.setattr(wordle, "numba", None)
+    # Forking after Numba has started its parallel threads can hang on exit, so use
+    # fresh worker processes here; the solver only ever runs one of the two paths.
+    monkeypatch.setattr(wordle, "multiprocessing", multiprocessing.get_context("spawn"))
+    np.testing.assert_array_equal(
+        wordle.get_pattern_matrix(guesses, answers), pattern_matrix
+    )
+
+
+def test_min_hardest_size_matches_partition_sizes(pattern_matrix: np.ndarray):
+    """The sorted-run shortcut finds the same best worst case as full counts."""
+    for answer_idx in random_answer_subsets(pattern_matrix.shape[1]):
+        patterns = pattern_matrix[:, answer_idx]
+        expected = wordle.get_partition_sizes(patterns).max(axis=1).min()
+        assert wordle.get_min_hardest_size(patterns) == expected
@@ -6,15 +6,42 @@ Written by Andrew Timmes (andrew.timmes@gmail.com).
 """
 
 import argparse
-import asyncio
-import functools
 import multiprocessing
+import os
+import tempfile
 from collections import defaultdict
-from multiprocessing.pool import ApplyResult
-from typing import Any, Dict, List, Tuple
+from typing import List, Tuple
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # Numba is optional; fall back to NumPy in a process pool.
+    numba = None
 
 ANSWERS_FILENAME = "answers.txt"
 GUESSES_FILENAME = "guesses.txt"
+MAX_PROCESSES = 16
+STRATEGIES = ["minimax", "entropy"]
+RESPONSE_CHARS = "ryg"
+VALID_LETTERS = frozenset("abcdefghijklmnopqrstuvwxyz")
+WORD_LENGTH = 5
+N_PATTERNS = 3**WORD_LENGTH
+PATTERN_WEIGHTS = 3 ** np.arange(WORD_LENGTH)
+GREEN_COUNTS = (np.arange(N_PATTERNS)[:, None] // PATTERN_WEIGHTS % 3 == 2).sum(axis=1)
+
+BINCOUNT_BLOCK_SIZE = 1 << 20
+
+# Constants for the SWAR green test in _eval_pattern_unique.
+_SWAR_LOW7 = np.uint64(0x7F7F7F7F7F7F7F7F)
+_SWAR_1 = np.uint64(1)
+_SWAR_7 = np.uint64(7)
+_SWAR_8 = np.uint64(8)
+
+# Legal answers and output for fill_guess_patterns, set per-process by _worker_init.
+_ANSWERS_ARR = np.empty((0, 5), dtype=np.uint8)
+_ANSWERS_MASK = np.empty(0, dtype=np.uint32)
+_PATTERNS = np.empty((0, 0), dtype=np.uint8)
 
 
 def main() -> None:
@@ -57,283 +84,703 @@ def main() -> None:
         lunes -c ygrry`
         """,
     )
+    argparser.add_argument(
+        "-s",
+        "--strategy",
+        choices=STRATEGIES,
+        default="minimax",
+        help="""
+        How to rank guesses: 'minimax' minimizes the largest remaining candidate set,
+        'entropy' maximizes the expected information from the response. Reported
+        responses are always the hardest ones.
+        """,
+    )
+    argparser.add_argument(
+        "-l",
+        "--lookahead",
+        type=int,
+        default=0,
+        metavar="N",
+        help="""
+        Re-rank the top N guesses by the largest candidate set left after the best
+        follow-up guess, breaking ties by the total over all responses. Disabled by
+        default.
+        """,
+    )
     args = argparser.parse_args()
+    if args.lookahead < 0:
+        argparser.error("argument -l/--lookahead: must not be negative")
     with open(args.answers_file, mode="r", encoding="utf-8") as answer_file:
-        legal_answers = [x.strip() for x in answer_file.readlines()]
+        legal_answers = [x.strip() for x in answer_file.readlines() if x.strip()]
     with open(args.guesses_file, mode="r", encoding="utf-8") as guess_file:
-        legal_guesses = [x.strip() for x in guess_file.readlines()] + legal_answers
+        legal_guesses = [
+            x.strip() for x in guess_file.readlines() if x.strip()
+        ] + legal_answers
+    args.guesses = [guess.lower() for guess in args.guesses]
+
+    validate_args(args, legal_guesses, legal_answers)
 
-    validate_args(args)
+    # The bundled lists are disjoint, but custom ones may overlap; drop repeats so
+    # each guess gets one row of the pattern matrix.
+    legal_guesses = list(dict.fromkeys(legal_guesses + args.guesses))
+    guess_index = {guess: i for i, guess in enumerate(legal_guesses)}
+    pattern_matrix = get_pattern_matrix(legal_guesses, legal_answers)
+    alive = np.ones(len(legal_answers), dtype=bool)
+    answer_idx = np.flatnonzero(alive)
 
     response = "rrrrr"
     while response != "ggggg":
         if args.guesses:
-            guesses = [args.guesses.pop(0)]
-        elif len(legal_answers) == 1:
-            guesses = legal_answers
+            guess_idx = np.array([guess_index[args.guesses.pop(0)]])
+        elif len(answer_idx) == 1:
+            guess_idx = np.array([guess_index[legal_answers[answer_idx[0]]]])
         else:
-            guesses = legal_guesses
-        guess_candidates = get_candidates(guesses, legal_answers)
-        gc_cardinalities = [
-            (
-                guess,
-                get_cardinalities(candidates),
-            )
-            for guess, candidates in guess_candidates.items()
-        ]
-        gc_cardinalities.sort(
-            key=lambda t: (
-                t[1][0][1],
-                t[1][0][0].count("g"),
+            guess_idx = np.arange(len(legal_guesses))
+        if numba is not None and args.strategy == "minimax" and args.lookahead <= 0:
+            sizes, worst_patterns = get_bounded_hardest_responses(
+                pattern_matrix, guess_idx, answer_idx
             )
+            scores = sizes
+        else:
+            counts = get_partition_sizes(pattern_matrix[np.ix_(guess_idx, answer_idx)])
+            sizes, worst_patterns = get_hardest_responses(counts)
+            if args.strategy == "entropy":
+                scores = -get_entropies(counts)
+            else:
+                scores = sizes
+        ranked = rank_guesses(
+            scores, sizes, GREEN_COUNTS[worst_patterns], max(1, args.lookahead)
         )
 
-        best_word = gc_cardinalities[0][0]
+        best_guess, hardest = guess_idx[ranked[0]], worst_patterns[ranked[0]]
+        if args.lookahead > 0 and len(guess_idx) > 1:
+            lookahead = [
+                (
+                    guess_idx[i],
+                    get_lookahead_score(pattern_matrix, guess_idx[i], answer_idx),
+                )
+                for i in ranked
+            ]
+            lookahead.sort(key=lambda t: t[1][:2])
+            best_guess, (_, _, hardest) = lookahead[0]
+        best_word = legal_guesses[best_guess]
         if args.clues:
             response = args.clues.pop(0)
         else:
-            response = gc_cardinalities[0][1][0][0]
-        legal_answers = guess_candidates[best_word][response]
-        print(best_word, response, len(legal_answers))
-        if len(legal_answers) < 1:
+            response = pattern_to_response(int(hardest))
+        alive &= pattern_matrix[best_guess] == response_to_pattern(response)
+        answer_idx = np.flatnonzero(alive)
+        print(best_word, response, len(answer_idx))
+        if len(answer_idx) < 1:
             raise Exception("Unexpected failure: no legal answers remaining")
 
 
-def get_candidates(
+def get_pattern_matrix(
     legal_guesses: List[str], legal_answers: List[str]
-) -> Dict[str, Dict[str, List[str]]]:
+) -> np.ndarray:
     """
-    Compute candidates from lists of legal guesses and answers.
+    Compute the response pattern of every legal guess against every legal answer.
+
+    Responses never change between turns, so this is computed once and sliced down
+    to the remaining answers each turn. Words must be WORD_LENGTH letters (see
+    validate_args) so that every pattern fits below N_PATTERNS in a uint8.
 
     Args:
         legal_guesses (List[str]): list of legal guesses
         legal_answers (List[str]): list of legal answers
 
     Returns:
-        Dict[str, Dict[str, List[str]]]: mapping of result to candidate list per-guess
-    """
-    results: Dict[str, Dict[str, List[str]]] = {}
-    with multiprocessing.Pool() as pool:
-        tasks: List[ApplyResult[Any]] = []
-        for guess in legal_guesses:
-            tasks.append(
-                pool.apply_async(
-                    get_hardest_response,
-                    (
-                        guess,
-                        legal_answers,
-                    ),
-                )
-            )
-        for task in tasks:
-            guess, candidates = task.get()
-            results[guess] = candidates
+        np.ndarray: (guesses, answers) uint8 array of response patterns
+    """
+    results = np.empty((len(legal_guesses), len(legal_answers)), dtype=np.uint8)
+    answers_arr, answers_mask = encode_words(legal_answers)
+    assert answers_arr.shape[1] == WORD_LENGTH, "words must be WORD_LENGTH letters"
+    if numba is not None:
+        guesses_arr, guesses_mask = encode_words(legal_guesses)
+        guesses_unique = np.array(
+            [int(mask).bit_count() == guesses_arr.shape[1] for mask in guesses_mask]
+        )
+        _fill_pattern_matrix(
+            guesses_arr,
+            pack_words(guesses_arr),
+            guesses_unique,
+            answers_arr,
+            pack_words(answers_arr),
+            answers_mask,
+            results,
+        )
+        return results
+    processes = min(os.cpu_count() or 1, MAX_PROCESSES)
+    chunksize = max(16, len(legal_guesses) // (processes * 4))
+    # Workers write their rows straight into a shared memory-mapped file rather than
+    # pickling them back.
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "patterns.npy")
+        patterns = np.lib.format.open_memmap(
+            path, mode="w+", dtype=np.uint8, shape=results.shape
+        )
+        with multiprocessing.Pool(
+            processes,
+            initializer=_worker_init,
+            initargs=(answers_arr, answers_mask, path),
+        ) as pool:
+            for _ in pool.imap_unordered(
+                fill_guess_patterns, enumerate(legal_guesses), chunksize=chunksize
+            ):
+                pass
+        results[:] = patterns
+        del patterns
     return results
 
 
-def get_cardinalities(candidates: Dict[str, List[str]]) -> List[Tuple[str, int]]:
+def rank_guesses(
+    scores: np.ndarray, sizes: np.ndarray, greens: np.ndarray, n: int
+) -> np.ndarray:
     """
-    Compute the size of candidate sets per-guess per-result.
+    Find the n best guesses: lowest score, then smallest hardest response, then
+    fewest greens in the hardest response.
+
+    Only guesses scoring at most the n-th lowest score are sorted, so this is linear
+    in the number of guesses for small n.
 
     Args:
-        candidates (Dict[str, List[str]]): mapping of result to candidate list per-guess
+        scores (np.ndarray): primary score per-guess, lower is better
+        sizes (np.ndarray): size of the largest candidate set per-guess
+        greens (np.ndarray): number of greens in the hardest response per-guess
+        n (int): number of guesses to return
 
     Returns:
-        List[Tuple[str, int]]: pairings of guess outputs and number of words
-    """
-    result: List[Tuple[str, int]] = []
-    for candidate in candidates:
-        result.append(
-            (
-                candidate,
-                len(candidates[candidate]),
-            )
-        )
-    result.sort(key=lambda t: t[1], reverse=True)
-    return result
+        np.ndarray: indices of the n best guesses, best first
+    """
+    n = min(n, len(scores))
+    threshold = np.partition(scores, n - 1)[n - 1]
+    subset = np.flatnonzero(scores <= threshold)
+    order = np.lexsort((greens[subset], sizes[subset], scores[subset]))
+    return subset[order[:n]]
+
+
+def get_hardest_responses(counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Determine the hardest response for each guess given its candidate set sizes.
+
+    Args:
+        counts (np.ndarray): (guesses, N_PATTERNS) array of candidate set sizes
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: size and pattern of the largest candidate set
+        per-guess
+    """
+    return counts.max(axis=1), counts.argmax(axis=1)
 
 
-def get_hardest_response(
-    guess: str, answers: List[str]
-) -> Tuple[str, Dict[str, List[str]]]:
+def get_bounded_hardest_responses(
+    pattern_matrix: np.ndarray, guess_idx: np.ndarray, answer_idx: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
     """
-    Determine the hardest response for a guess given a list of possible answers.
+    Determine the hardest response for each guess, skipping hopeless guesses.
 
-    This function wraps the _async function for use in multiprocessing.Pool above.
+    Counting for a guess stops as soon as one of its candidate sets is larger than
+    the smallest hardest response seen so far. The size reported for such a guess
+    is only a lower bound (still larger than the best), and its pattern is
+    meaningless, so only the best guesses' results are exact. Requires Numba.
 
     Args:
-        guess (str): guess
-        answers (List[str]): list of legal answers
+        pattern_matrix (np.ndarray): (guesses, answers) array of response patterns
+        guess_idx (np.ndarray): rows of the guesses in pattern_matrix
+        answer_idx (np.ndarray): columns of the remaining answers in pattern_matrix
 
     Returns:
-        Tuple[str, Dict[str, List[str]]]: mapping of guess to results and their
-        candidates
+        Tuple[np.ndarray, np.ndarray]: size and pattern of the largest candidate set
+        per-guess
     """
-    return asyncio.run(_get_hardest_response(guess, answers))
+    sizes = np.empty(len(guess_idx), dtype=np.intp)
+    worst_patterns = np.empty(len(guess_idx), dtype=np.intp)
+    _bounded_hardest_responses(
+        pattern_matrix, guess_idx, answer_idx, sizes, worst_patterns
+    )
+    return sizes, worst_patterns
 
 
-async def _get_hardest_response(
-    guess: str, answers: List[str]
-) -> Tuple[str, Dict[str, List[str]]]:
+def get_entropies(counts: np.ndarray) -> np.ndarray:
     """
-    Determine the hardest response for a guess given a list of possible answers.
+    Compute the entropy of the response to each guess, in bits.
 
     Args:
-        guess (str): guess
-        answers (List[str]): list of legal answers
+        counts (np.ndarray): (guesses, N_PATTERNS) array of candidate set sizes
 
     Returns:
-        Tuple[str, Dict[str, List[str]]]: mapping of guess to results and their
-        candidates
+        np.ndarray: entropy of the response distribution per-guess
     """
-    candidates: defaultdict[str, List[str]] = defaultdict(list)
-    for answer in answers:
-        response = eval_guess(guess, answer)
-        candidates[response].append(answer)
-    return guess, candidates
+    p = counts / counts.sum(axis=1, keepdims=True)
+    log_p = np.log2(p, out=np.zeros_like(p), where=counts > 0)
+    return -(p * log_p).sum(axis=1)
 
 
-def eval_guess(guess: str, answer: str) -> str:
+def get_lookahead_score(
+    pattern_matrix: np.ndarray, guess: int, answer_idx: np.ndarray
+) -> Tuple[int, int, int]:
     """
-    Compute the result of a given guess and a given answer.
+    Score a guess by how well the best follow-up guess splits each response.
 
     Args:
-        guess (str): guess
-        answer (str): answer
+        pattern_matrix (np.ndarray): (guesses, answers) array of response patterns
+        guess (int): row of the guess in pattern_matrix
+        answer_idx (np.ndarray): columns of the remaining answers in pattern_matrix
 
-    Raises:
-        Exception: raised if the guess and answer don't have the same length.
+    Returns:
+        Tuple[int, int, int]: largest candidate set left after the best follow-up
+        guess over all responses, the sum of those sizes weighted by how many answers
+        give each response, and the hardest response pattern
+    """
+    patterns = pattern_matrix[guess, answer_idx]
+    worst, total, hardest, hardest_size = 0, 0, 0, 0
+    for pattern in np.unique(patterns):
+        if pattern == N_PATTERNS - 1:
+            continue  # solved
+        sub_idx = answer_idx[patterns == pattern]
+        size = get_min_hardest_size(pattern_matrix[:, sub_idx])
+        total += size * len(sub_idx)
+        if (size, len(sub_idx)) > (worst, hardest_size):
+            worst, hardest, hardest_size = size, int(pattern), len(sub_idx)
+    return worst, total, hardest
+
+
+def get_min_hardest_size(patterns: np.ndarray) -> int:
+    """
+    Compute the size of the largest candidate set left by the best guess.
+
+    Sorting each row turns candidate sets into runs of equal patterns, so a guess
+    leaves a candidate set larger than k exactly when some pattern in its row equals
+    the one k places after it.
+
+    Args:
+        patterns (np.ndarray): (guesses, answers) array of response patterns
 
     Returns:
-        str: result of the guess: "g" indicates right letter and place, "y" indicates
-        right letter, wrong place, and "r" indicates wrong letter.
+        int: smallest largest-candidate-set size over all guesses
     """
-    if len(guess) != len(answer):
-        raise Exception(f"{guess} and {answer} do not have matching length")
-    result = ["r"] * 5
-    count: defaultdict[str, int] = defaultdict(int)
-    seen: defaultdict[str, int] = defaultdict(int)
+    ordered = np.sort(patterns, axis=1)
+    size = 1
+    while (
+        size < ordered.shape[1]
+        and (ordered[:, size:] == ordered[:, :-size]).any(axis=1).all()
+    ):
+        size += 1
+    return size
 
-    for c in answer:
-        count[c] += 1
 
-    for i, c in enumerate(guess):
-        if c == answer[i]:
-            result[i] = "g"
-            seen[guess[i]] += 1
+def get_partition_sizes(patterns: np.ndarray) -> np.ndarray:
+    """
+    Count the answers giving each response pattern, per-guess.
 
-    for i, c in enumerate(guess):
-        if result[i] != "g":
-            if guess[i] in answer:
-                if seen[guess[i]] < count[guess[i]]:
-                    result[i] = "y"
-                    seen[guess[i]] += 1
+    Rows are offset into disjoint ranges so that a single bincount covers a block
+    of guesses; blocks keep the temporary index array small. Patterns must be below
+    N_PATTERNS, or they would spill into the next row's bins.
 
+    Args:
+        patterns (np.ndarray): (guesses, answers) array of response patterns
+
+    Returns:
+        np.ndarray: (guesses, N_PATTERNS) array of candidate set sizes
+    """
+    assert patterns.size == 0 or patterns.max() < N_PATTERNS, "pattern out of range"
+    counts = np.empty((len(patterns), N_PATTERNS), dtype=np.intp)
+    step = max(1, BINCOUNT_BLOCK_SIZE // max(1, patterns.shape[1]))
+    for start in range(0, len(patterns), step):
+        stop = start + step
+        block = patterns[start:stop].astype(np.intp)
+        block += N_PATTERNS * np.arange(len(block))[:, None]
+        counts[start:stop] = np.bincount(
+            block.ravel(), minlength=len(block) * N_PATTERNS
+        ).reshape(-1, N_PATTERNS)
+    return counts
+
+
+def _worker_init(
+    answers_arr: np.ndarray, answers_mask: np.ndarray, patterns_path: str
+) -> None:
+    """
+    Set the legal answers and output matrix used by fill_guess_patterns.
+
+    Args:
+        answers_arr (np.ndarray): letter codes of legal answers (see encode_words)
+        answers_mask (np.ndarray): letter-presence masks of legal answers
+        patterns_path (str): .npy file holding the pattern matrix to fill
+    """
+    global _ANSWERS_ARR, _ANSWERS_MASK, _PATTERNS  # pylint: disable=global-statement
+    _ANSWERS_ARR = answers_arr
+    _ANSWERS_MASK = answers_mask
+    _PATTERNS = np.load(patterns_path, mmap_mode="r+")
+
+
+def fill_guess_patterns(task: Tuple[int, str]) -> None:
+    """
+    Write the response pattern of a guess against every legal answer.
+
+    Args:
+        task (Tuple[int, str]): row of the pattern matrix and its guess
+    """
+    i, guess = task
+    _PATTERNS[i] = eval_guess_patterns(guess, _ANSWERS_ARR, _ANSWERS_MASK)
+
+
+def eval_guess_patterns(
+    guess: str, answers_arr: np.ndarray, answers_mask: np.ndarray
+) -> np.ndarray:
+    """
+    Compute the response pattern of a guess against every answer.
+
+    Args:
+        guess (str): guess
+        answers_arr (np.ndarray): letter codes of legal answers (see encode_words)
+        answers_mask (np.ndarray): letter-presence masks of legal answers
+
+    Returns:
+        np.ndarray: base-3 response pattern per answer (see pattern_to_response)
+    """
+    guess_arr, guess_mask = encode_words([guess])
+    greens, yellows = eval_guess_batch(
+        guess_arr[0], int(guess_mask[0]), answers_arr, answers_mask
+    )
+    patterns = (greens * 2 + yellows) @ PATTERN_WEIGHTS[: len(guess)]
+    return patterns.astype(np.uint8)
+
+
+def pattern_to_response(pattern: int, n: int = WORD_LENGTH) -> str:
+    """
+    Convert a response pattern back to its string form.
+
+    Args:
+        pattern (int): base-3 response pattern (r=0, y=1, g=2; first letter lowest)
+        n (int, optional): size of guess/response. Defaults to WORD_LENGTH.
+
+    Returns:
+        str: response, e.g. "ygrry"
+    """
+    result = []
+    for _ in range(n):
+        pattern, digit = divmod(pattern, 3)
+        result.append(RESPONSE_CHARS[digit])
     return "".join(result)
 
 
-def is_candidate(word: str, guesses: List[str], responses: List[str]) -> bool:
+def response_to_pattern(response: str) -> int:
     """
-    Compute whether or not a word is a candidate answer for given word and resposnes.
+    Convert a response string to its base-3 pattern.
 
     Args:
-        word (str): possible answer
-        guesses (List[str]): list of previous guesses
-        responses (List[str]): list of previous responses to guesses
+        response (str): response, e.g. "ygrry"
 
     Returns:
-        bool: [description]
+        int: base-3 response pattern (r=0, y=1, g=2; first letter lowest)
     """
-    for i, guess in enumerate(guesses):
-        if not is_legal_guess(word, guess, responses[i]):
-            return False
-    return True
+    return sum(RESPONSE_CHARS.index(c) * 3**i for i, c in enumerate(response))
 
 
-def is_legal_guess(word: str, guess: str, response: str) -> bool:
+def encode_words(words: List[str]) -> Tuple[np.ndarray, np.ndarray]:
     """
-    Compute whether or not a guess is legal.
+    Encode words as arrays of letter codes and letter-presence bitmasks.
 
     Args:
-        word (str): candidate word
-        guess (str): guess
-        response (str): guess response
+        words (List[str]): list of lowercase words of equal length
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (N, length) uint8 array of letter codes (0-25)
+        and (N,) uint32 array of 26-bit letter-presence masks
 
     Raises:
-        Exception: raised if word/guess don't have the same length
-        Exception: raised if guess/clues don't have the same length
+        Exception: raised if the words don't have the same length
+        Exception: raised if a word has characters other than a-z
+    """
+    for word in words:
+        if len(word) != len(words[0]):
+            raise Exception(f"{word} and {words[0]} do not have matching length")
+    raw = "".join(words).encode()
+    if len(raw) != len("".join(words)):
+        raise Exception("Words must only contain lowercase letters a-z")
+    codes = np.frombuffer(raw, dtype=np.uint8).reshape(len(words), -1) - ord("a")
+    if codes.size and codes.max() >= 26:
+        # Bytes below "a" wrap around, so this catches them too.
+        raise Exception("Words must only contain lowercase letters a-z")
+    masks = np.bitwise_or.reduce(np.uint32(1) << codes.astype(np.uint32), axis=1)
+    return codes, masks
+
+
+def pack_words(words_arr: np.ndarray) -> np.ndarray:
+    """
+    Pack encoded words into one byte per letter of a uint64, first letter lowest.
+
+    Args:
+        words_arr (np.ndarray): (N, length <= 8) array of letter codes
 
     Returns:
-        bool: whether or not a word is a candidate given the guess and response
+        np.ndarray: (N,) uint64 array of packed words
     """
-    if len(word) != len(guess):
-        raise Exception(f"{word} and {guess} do not have matching length")
-    if len(guess) != len(response):
-        raise Exception(f"{guess} and {response} do not have matching length")
-    count: defaultdict[str, int] = defaultdict(int)
-    for c in word:
-        count[c] += 1
-    seen: defaultdict[str, int] = defaultdict(int)
-    for i, c in enumerate(guess):
-        match response[i]:
-            case "r":
-                if c in word:
-                    return False
-            case "g":
-                if word[i] != c or seen[c] == count[guess[i]]:
-                    return False
-                seen[c] += 1
-            case "y":
-                if word[i] == c or seen[c] == count[guess[i]]:
-                    return False
-            case _:
-                raise Exception(
-                    f"Invalid character found in guess response: {response}"
+    shifts = np.arange(words_arr.shape[1], dtype=np.uint64) * np.uint64(8)
+    return np.bitwise_or.reduce(words_arr.astype(np.uint64) << shifts, axis=1)
+
+
+def eval_guess_batch(
+    guess_arr: np.ndarray,
+    guess_mask: int,
+    answers_arr: np.ndarray,
+    answers_mask: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute the result of a given guess against every answer at once.
+
+    Equivalent to calling eval_guess for each answer.
+
+    Args:
+        guess_arr (np.ndarray): letter codes of the guess
+        guess_mask (int): letter-presence mask of the guess
+        answers_arr (np.ndarray): letter codes of legal answers
+        answers_mask (np.ndarray): letter-presence masks of legal answers
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (N, length) boolean arrays of green and yellow
+        positions per answer
+    """
+    greens = answers_arr == guess_arr
+    present = (answers_mask[:, None] >> guess_arr.astype(np.uint32)) & 1
+    yellows = ~greens & present.astype(bool)
+    if guess_mask.bit_count() < len(guess_arr):
+        # Repeated letters: only as many yellows as unmatched copies in the answer.
+        letters, counts = np.unique(guess_arr, return_counts=True)
+        for letter in letters[counts > 1]:
+            positions = np.flatnonzero(guess_arr == letter)
+            available = (answers_arr == letter).sum(axis=1)
+            available -= greens[:, positions].sum(axis=1)
+            used = np.zeros(len(answers_arr), dtype=available.dtype)
+            for i in positions:
+                yellows[:, i] &= used < available
+                used += yellows[:, i]
+    return greens, yellows
+
+
+def _eval_pattern(guess: np.ndarray, answer: np.ndarray, counts: np.ndarray) -> int:
+    """
+    Compute the response pattern of one encoded guess against one encoded answer.
+
+    Compiled with Numba when available.
+
+    Args:
+        guess (np.ndarray): letter codes of the guess
+        answer (np.ndarray): letter codes of the answer
+        counts (np.ndarray): 26-slot scratch array, all zero; left all zero on return
+
+    Returns:
+        int: base-3 response pattern (see pattern_to_response)
+    """
+    pattern = 0
+    weight = 1
+    for i in range(len(guess)):
+        if guess[i] == answer[i]:
+            pattern += 2 * weight
+        else:
+            counts[answer[i]] += 1
+        weight *= 3
+    weight = 1
+    for i in range(len(guess)):
+        if guess[i] != answer[i] and counts[guess[i]] > 0:
+            pattern += weight
+            counts[guess[i]] -= 1
+        weight *= 3
+    for i in range(len(answer)):
+        counts[answer[i]] = 0
+    return pattern
+
+
+def _eval_pattern_unique(
+    guess: np.ndarray,
+    guess_packed: np.uint64,
+    answer_packed: np.uint64,
+    answer_mask: np.uint32,
+) -> int:
+    """
+    Compute the response pattern of a guess with no repeated letters.
+
+    Greens come from a SWAR zero-byte test on the XOR of the packed words (exact
+    per byte, unlike the cheaper "has zero byte" test). With no repeated letters in
+    the guess, every other letter present in the answer is yellow. Compiled with
+    Numba when available.
+
+    Args:
+        guess (np.ndarray): letter codes of the guess
+        guess_packed (np.uint64): packed guess (see pack_words)
+        answer_packed (np.uint64): packed answer
+        answer_mask (np.uint32): letter-presence mask of the answer
+
+    Returns:
+        int: base-3 response pattern (see pattern_to_response)
+    """
+    x = guess_packed ^ answer_packed
+    greens = ~(((x & _SWAR_LOW7) + _SWAR_LOW7) | x | _SWAR_LOW7) >> _SWAR_7
+    pattern = 0
+    weight = 1
+    for i in range(len(guess)):
+        if greens & _SWAR_1:
+            pattern += 2 * weight
+        elif (answer_mask >> guess[i]) & 1:
+            pattern += weight
+        greens >>= _SWAR_8
+        weight *= 3
+    return pattern
+
+
+def _fill_pattern_matrix(
+    guesses_arr: np.ndarray,
+    guesses_packed: np.ndarray,
+    guesses_unique: np.ndarray,
+    answers_arr: np.ndarray,
+    answers_packed: np.ndarray,
+    answers_mask: np.ndarray,
+    out: np.ndarray,
+) -> None:
+    """
+    Fill out[i, j] with the response pattern of guess i against answer j.
+
+    Compiled with Numba when available, parallelized over guesses.
+
+    Args:
+        guesses_arr (np.ndarray): letter codes of legal guesses (see encode_words)
+        guesses_packed (np.ndarray): packed legal guesses (see pack_words)
+        guesses_unique (np.ndarray): whether each guess has no repeated letters
+        answers_arr (np.ndarray): letter codes of legal answers
+        answers_packed (np.ndarray): packed legal answers
+        answers_mask (np.ndarray): letter-presence masks of legal answers
+        out (np.ndarray): (guesses, answers) uint8 array to fill
+    """
+    for i in prange(guesses_arr.shape[0]):  # pylint: disable=not-an-iterable
+        guess = guesses_arr[i]
+        if guesses_unique[i]:
+            for j in range(answers_arr.shape[0]):
+                out[i, j] = _eval_pattern_unique(
+                    guess, guesses_packed[i], answers_packed[j], answers_mask[j]
                 )
+        else:
+            counts = np.zeros(26, dtype=np.int8)
+            for j in range(answers_arr.shape[0]):
+                out[i, j] = _eval_pattern(guess, answers_arr[j], counts)
+
+
+def _bounded_hardest_responses(
+    pattern_matrix: np.ndarray,
+    guess_idx: np.ndarray,
+    answer_idx: np.ndarray,
+    sizes: np.ndarray,
+    worst_patterns: np.ndarray,
+) -> None:
+    """
+    Fill sizes and worst_patterns for get_bounded_hardest_responses.
+
+    Compiled with Numba when available.
 
-    return True
+    Args:
+        pattern_matrix (np.ndarray): (guesses, answers) array of response patterns
+        guess_idx (np.ndarray): rows of the guesses in pattern_matrix
+        answer_idx (np.ndarray): columns of the remaining answers in pattern_matrix
+        sizes (np.ndarray): output size of the largest candidate set per-guess
+        worst_patterns (np.ndarray): output pattern of the largest candidate set
+    """
+    best = len(answer_idx)
+    counts = np.zeros(N_PATTERNS, dtype=np.int32)
+    for k in range(len(guess_idx)):
+        row = pattern_matrix[guess_idx[k]]
+        counts[:] = 0
+        largest = 0
+        for j in range(len(answer_idx)):
+            pattern = row[answer_idx[j]]
+            counts[pattern] += 1
+            if counts[pattern] > largest:
+                largest = counts[pattern]
+                if largest > best:
+                    break
+        sizes[k] = largest
+        worst_patterns[k] = np.argmax(counts)
+        best = min(best, largest)
+
+
+if numba is not None:
+    prange = numba.prange
+    _eval_pattern = numba.njit(cache=True)(_eval_pattern)
+    _eval_pattern_unique = numba.njit(cache=True)(_eval_pattern_unique)
+    _fill_pattern_matrix = numba.njit(cache=True, parallel=True)(_fill_pattern_matrix)
+    _bounded_hardest_responses = numba.njit(cache=True)(_bounded_hardest_responses)
+else:
+    prange = range
 
 
-@functools.lru_cache()
-def enumerate_responses(n: int = 5) -> List[str]:
+def eval_guess(guess: str, answer: str) -> str:
     """
-    Generate a list of all possible guess responses.
+    Compute the result of a given guess and a given answer.
+
+    This is the plain reference scorer. The solver itself uses the pattern matrix,
+    and test_wordle.py checks the faster scorers against this function.
 
     Args:
-        n (int, optional): size of guess/response. Defaults to 5.
+        guess (str): guess
+        answer (str): answer
+
+    Raises:
+        Exception: raised if the guess and answer don't have the same length.
 
     Returns:
-        List[str]: list of valid responses
+        str: result of the guess: "g" indicates right letter and place, "y" indicates
+        right letter, wrong place, and "r" indicates wrong letter.
     """
-    results = [""]
-    possibilities = ["r", "y", "g"]
-    for _ in range(n):
-        results = [r + c for r in results for c in possibilities]
-    return results
+    if len(guess) != len(answer):
+        raise Exception(f"{guess} and {answer} do not have matching length")
+    result = ["r"] * len(guess)
+    count: defaultdict[str, int] = defaultdict(int)
+    seen: defaultdict[str, int] = defaultdict(int)
+
+    for c in answer:
+        count[c] += 1
 
+    for i, c in enumerate(guess):
+        if c == answer[i]:
+            result[i] = "g"
+            seen[guess[i]] += 1
 
-def validate_args(args: argparse.Namespace) -> None:
+    for i, c in enumerate(guess):
+        if result[i] != "g":
+            if guess[i] in answer:
+                if seen[guess[i]] < count[guess[i]]:
+                    result[i] = "y"
+                    seen[guess[i]] += 1
+
+    return "".join(result)
+
+
+def validate_args(
+    args: argparse.Namespace, legal_guesses: List[str], legal_answers: List[str]
+) -> None:
     """
-    Validate arguments for sanity.
+    Validate arguments and word lists for sanity.
 
     Args:
         args (argparse.Namespace): CLI arguments
+        legal_guesses (List[str]): list of legal guesses, including legal answers
+        legal_answers (List[str]): list of legal answers
 
     Raises:
-        Exception: guess lengths don't match
+        Exception: no legal answers given
+        Exception: word is not WORD_LENGTH lowercase letters a-z
         Exception: more clues specified than guesses
         Exception: clue length doesn't match guess length
         Exception: invalid character found in clue
     """
-    guess_length = 0
-    if args.guesses:
-        guess_length = len(args.guesses[0])
-        for guess in args.guesses:
-            if len(guess) != guess_length:
-                raise Exception(
-                    f'Invalid guess options: "{guess}" length does not match \
-                    "{args.guesses[0]}"'
-                )
+    if not legal_answers:
+        raise Exception("No legal answers given")
+    # Response patterns are stored as base-3 ints in a uint8, so the word length is
+    # fixed.
+    guess_length = WORD_LENGTH
+    for word in legal_guesses + args.guesses:
+        if len(word) != guess_length or not set(word) <= VALID_LETTERS:
+            raise Exception(
+                f'Invalid word: "{word}" is not {guess_length} lowercase letters a-z'
+            )
     if args.clues:
         valid_chars = set(["r", "y", "g"])
         if len(args.clues) > len(args.guesses):
@@ -344,7 +791,7 @@ def validate_args(args: argparse.Namespace) -> None:
         for clue in args.clues:
             if len(clue) != guess_length:
                 raise Exception(
-                    f'Invalid clue: "{clue}" length does not match "{args.guesses[0]}"'
+                    f'Invalid clue: "{clue}" length does not match "{legal_answers[0]}"'
                 )
             for c in clue:
                 if c not in valid_chars: